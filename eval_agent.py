@@ -38,15 +38,15 @@ if langsmith_key == "NOT_SET":
 else:
     print(f"✅ LangSmith API Key configured\n")
 
-from ts_agent.runner import run_agent_with_conversation_id
+from ts_agent.runner import AgentResult, run_agent_with_conversation_id
 
 
-def extract_messages(result: dict) -> str:
+def extract_messages(result: AgentResult) -> str:
     """Extract conversation messages as readable text."""
     messages = []
     
     # Get messages from state
-    state_messages = result.get("messages", [])
+    state_messages = result.messages
     if state_messages:
         for msg in state_messages:
             if isinstance(msg, dict):
@@ -59,11 +59,11 @@ def extract_messages(result: dict) -> str:
     return " | ".join(messages) if messages else "No messages"
 
 
-def extract_tool_calls(result: dict) -> str:
+def extract_tool_calls(result: AgentResult) -> str:
     """Extract all tool calls across hops."""
     tool_calls = []
     
-    hops = result.get("hops", [])
+    hops = result.hops
     for hop_idx, hop in enumerate(hops):
         if "plan" in hop and "tool_calls" in hop["plan"]:
             calls = hop["plan"]["tool_calls"]
@@ -76,9 +76,9 @@ def extract_tool_calls(result: dict) -> str:
     return ", ".join(tool_calls) if tool_calls else "No tools"
 
 
-def extract_response(result: dict) -> str:
+def extract_response(result: AgentResult) -> str:
     """Extract the final response text."""
-    draft = result.get("draft")
+    draft = result.draft
     if draft and isinstance(draft, dict):
         response = draft.get("response", "")
         response_type = draft.get("response_type", "UNKNOWN")
@@ -86,14 +86,14 @@ def extract_response(result: dict) -> str:
         response = response.replace("\n", " ").replace("\r", " ")
         return f"[{response_type}] {response}"
     
-    response = result.get("response", "No response")
+    response = result.response
     response = response.replace("\n", " ").replace("\r", " ")
     return response
 
 
-def extract_escalation(result: dict) -> str:
+def extract_escalation(result: AgentResult) -> str:
     """Extract escalation reason if any."""
-    escalation = result.get("escalation_reason")
+    escalation = result.escalation_reason
     if escalation:
         # Replace newlines with space for CSV compatibility
         escalation = escalation.replace("\n", " ").replace("\r", " ")
@@ -101,15 +101,15 @@ def extract_escalation(result: dict) -> str:
     return ""
 
 
-def extract_hops_count(result: dict) -> int:
+def extract_hops_count(result: AgentResult) -> int:
     """Extract number of hops."""
-    hops = result.get("hops", [])
+    hops = result.hops
     return len(hops)
 
 
-def extract_error(result: dict) -> str:
+def extract_error(result: AgentResult) -> str:
     """Extract error if any."""
-    error = result.get("error")
+    error = result.error
     if error:
         # Replace newlines with space for CSV compatibility
         error = error.replace("\n", " ").replace("\r", " ")
@@ -129,7 +129,7 @@ def process_conversation(conv_id: str) -> dict:
         
         # Extract data
         timestamp = datetime.now().isoformat()
-        user_email = result.get("user_email", "")
+        user_email = result.user_email or ""
         messages = extract_messages(result)
         tool_calls = extract_tool_calls(result)
         response = extract_response(result)
@@ -141,7 +141,7 @@ def process_conversation(conv_id: str) -> dict:
         print(f"   User: {user_email if user_email else 'N/A'}")
         print(f"   Hops: {hops}")
         print(f"   Tool Calls: {tool_calls[:150]}{'...' if len(tool_calls) > 150 else ''}")
-        draft = result.get('draft') or {}
+        draft = result.draft or {}
         print(f"   Response Type: {draft.get('response_type', 'N/A')}")
         
         if escalation:
@@ -16,6 +16,7 @@ load_dotenv(project_root / ".env")
 
 from ts_agent.runner import run_agent_with_conversation_id
 import json
+from dataclasses import asdict
 
 
 def main():
@@ -43,12 +44,12 @@ def main():
         print("\n" + "=" * 80)
         print("📊 RESULTS")
         print("=" * 80)
-        print(f"\n✅ Response: {result.get('response', 'No response')}")
-        print(f"\n❌ Error: {result.get('error', 'None')}")
-        print(f"\n🔢 Hops: {len(result.get('hops', []))}")
+        print(f"\n✅ Response: {result.response}")
+        print(f"\n❌ Error: {result.error}")
+        print(f"\n🔢 Hops: {len(result.hops)}")
         
         # Show actions taken
-        actions = result.get("actions", [])
+        actions = result.actions
         if actions:
             print(f"\n⚡ ACTIONS TAKEN: {len(actions)}")
             for i, action in enumerate(actions, 1):
@@ -62,7 +63,7 @@ def main():
         
         # Show hop breakdown
         print(f"\n📋 HOP BREAKDOWN:")
-        for i, hop in enumerate(result.get("hops", []), 1):
+        for i, hop in enumerate(result.hops, 1):
             print(f"\n  Hop {i}:")
             plan = hop.get("plan", {})
             gather = hop.get("gather", {})
@@ -85,9 +86,9 @@ def main():
                     print(f"    🎯 Action Decided: {action_tool_call.get('tool_name') if isinstance(action_tool_call, dict) else 'N/A'}")
         
         # Show escalation info
-        if result.get("escalate"):
+        if result.escalate:
             print(f"\n🚨 ESCALATED:")
-            escalate_data = result.get("escalate", {})
+            escalate_data = result.escalate
             print(f"    Reason: {escalate_data.get('escalation_reason')}")
             print(f"    Note Added: {escalate_data.get('note_added')}")
         
@@ -97,7 +98,7 @@ def main():
         
         # Save full result to file
         with open("test_result.json", "w") as f:
-            json.dump(result, f, indent=2, default=str)
+            json.dump(asdict(result), f, indent=2, default=str)
         
     except Exception as e:
         print(f"\n❌ ERROR: {e}", file=sys.stderr)
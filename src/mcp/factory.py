@@ -1,10 +1,15 @@
 """Factory for creating MCP client and tools."""
 
 import os
-from typing import Optional
+import threading
+from typing import Dict, Optional, Tuple
 from .client import MCPClient
 from .tools import MCPTools
 
+# Shared clients keyed by (base_url, auth_token); guarded for multi-threaded runners
+_shared_clients: Dict[Tuple[str, str], MCPClient] = {}
+_shared_clients_lock = threading.Lock()
+
 
 def create_mcp_client(
     base_url: Optional[str] = None,
@@ -34,6 +39,41 @@ def create_mcp_client(
     return MCPClient(base_url=base_url, auth_token=auth_token)
 
 
+def get_mcp_client(
+    base_url: Optional[str] = None,
+    auth_token: Optional[str] = None
+) -> MCPClient:
+    """
+    Get the process-wide MCP client for the given configuration.
+    
+    Unlike create_mcp_client, the client (and its HTTP connection pool) is created
+    once and reused by every node and agent run, so callers must not close it.
+    
+    Args:
+        base_url: MCP server base URL (defaults to MCP_BASE_URL env var)
+        auth_token: Authentication token (defaults to MCP_AUTH_TOKEN env var)
+        
+    Returns:
+        Shared MCPClient instance
+        
+    Raises:
+        ValueError: If required configuration is missing
+    """
+    base_url = base_url or os.getenv("MCP_BASE_URL")
+    auth_token = auth_token or os.getenv("MCP_AUTH_TOKEN")
+    key = (base_url, auth_token)
+    
+    client = _shared_clients.get(key)
+    if client is None:
+        with _shared_clients_lock:
+            client = _shared_clients.get(key)
+            if client is None:
+                client = create_mcp_client(base_url, auth_token)
+                _shared_clients[key] = client
+    
+    return client
+
+
 def create_mcp_tools(
     base_url: Optional[str] = None,
     auth_token: Optional[str] = None
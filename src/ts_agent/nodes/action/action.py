@@ -5,7 +5,7 @@ import time
 from typing import Dict, Any
 from ts_agent.types import State
 from .schemas import ActionData, ActionResult
-from src.mcp.factory import create_mcp_client
+from src.mcp.factory import get_mcp_client
 from src.clients.intercom import IntercomClient
 from src.utils.formatting import format_action_audit_note
 
@@ -73,8 +73,8 @@ def action_node(state: State) -> State:
     print("=" * 50)
     
     try:
-        # Create MCP client (don't store in state due to serialization issues)
-        mcp_client = create_mcp_client()
+        # Get shared MCP client (don't store in state due to serialization issues)
+        mcp_client = get_mcp_client()
         
         # Execute the action tool
         start_time = time.time()
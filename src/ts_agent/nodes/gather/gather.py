@@ -5,7 +5,7 @@ import time
 from typing import Dict, Any, List
 from ts_agent.types import State
 from .schemas import GatherData, ToolCall, ToolResult, GatherRequest
-from src.mcp.factory import create_mcp_client
+from src.mcp.factory import get_mcp_client
 
 
 def gather_node(state: State) -> State:
@@ -47,8 +47,8 @@ def gather_node(state: State) -> State:
         return state
     
     try:
-        # Create MCP client (don't store in state due to serialization issues)
-        mcp_client = create_mcp_client()
+        # Get shared MCP client (don't store in state due to serialization issues)
+        mcp_client = get_mcp_client()
         
         # Execute all tool calls
         results = []
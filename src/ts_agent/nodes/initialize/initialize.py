@@ -4,12 +4,51 @@ Initialize node for setting up conversation data and available tools.
 
 import os
 import time
+import logging
 from typing import Dict, Any
 from ts_agent.types import State, ToolType
 from src.clients.intercom import IntercomClient
-from src.mcp.factory import create_mcp_client
+from src.mcp.factory import get_mcp_client
+from src.utils.formatting import format_tool_for_prompt
 from .schemas import InitializeData
 
+logger = logging.getLogger(__name__)
+
+# Defaults applied to state after a successful initialization.
+# Mutable defaults are factories so each conversation gets its own instance.
+_STATE_DEFAULTS: Dict[str, Any] = {
+    "tool_data": dict,
+    "docs_data": dict,
+    "hops": list,
+    "max_hops": 3,
+    "actions": list,
+    "max_actions": 1,
+    "actions_taken": 0,
+    "response": "",
+    "error": None,
+}
+
+
+def _now_iso() -> str:
+    """Return the current UTC time as an ISO-8601 timestamp."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _failed_init(conversation_id: str, error_msg: str, timestamp: str) -> Dict[str, Any]:
+    """Build the initialize data recorded when initialization fails."""
+    return InitializeData(
+        conversation_id=conversation_id,
+        messages_count=0,
+        user_name=None,
+        user_email=None,
+        subject=None,
+        tools_count=0,
+        melvin_admin_id="",
+        timestamp=timestamp,
+        success=False,
+        error=error_msg
+    ).model_dump()
+
 
 def initialize_node(state: State) -> State:
     """
@@ -21,28 +60,15 @@ def initialize_node(state: State) -> State:
     Returns:
         Updated state with conversation data and available tools
     """
+    timestamp = _now_iso()
+    
     # Get conversation ID and Melvin admin ID FIRST (before any potential failures)
     conversation_id = state.get("conversation_id")
     if not conversation_id:
         state["error"] = "conversation_id is required"
-        initialize_data = InitializeData(
-            conversation_id="",
-            messages_count=0,
-            user_name=None,
-            user_email=None,
-            subject=None,
-            tools_count=0,
-            melvin_admin_id="",
-            timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            success=False,
-            error="conversation_id is required"
-        )
-        state["initialize"] = initialize_data.model_dump()
+        state["initialize"] = _failed_init("", "conversation_id is required", timestamp)
         return state
     
-    # Set conversation_id in state immediately
-    state["conversation_id"] = conversation_id
-    
     # Get Melvin admin ID and set it in state immediately
     melvin_admin_id = os.getenv("MELVIN_ADMIN_ID")
     if melvin_admin_id:
@@ -52,7 +78,7 @@ def initialize_node(state: State) -> State:
     if "available_tools" not in state or state["available_tools"] is None:
         try:
             
-            print(f"📞 Fetching conversation data from Intercom: {conversation_id}")
+            logger.info("📞 Fetching conversation data from Intercom: %s", conversation_id)
             
             # Initialize Intercom client
             intercom_api_key = os.getenv("INTERCOM_API_KEY")
@@ -79,24 +105,24 @@ def initialize_node(state: State) -> State:
             }
             state["subject"] = conversation_data.get("subject") or ""  # Default to empty string if None
             
-            print(f"✅ Using {len(state['messages'])} message(s) from Intercom")
-            print(f"✅ User name: {conversation_data.get('user_name', 'Not found')}")
-            print(f"✅ User email: {conversation_data.get('user_email', 'Not found')}")
-            print(f"✅ Subject: {conversation_data.get('subject', 'None')}")
-            print(f"✅ Melvin admin ID: {melvin_admin_id}")
+            logger.info("✅ Using %d message(s) from Intercom", len(state["messages"]))
+            logger.info("✅ User name: %s", conversation_data.get("user_name", "Not found"))
+            logger.info("✅ User email: %s", conversation_data.get("user_email", "Not found"))
+            logger.info("✅ Subject: %s", conversation_data.get("subject", "None"))
+            logger.info("✅ Melvin admin ID: %s", melvin_admin_id)
             
             # Initialize MCP client
-            print("🔌 Initializing MCP client...")
-            mcp_client = create_mcp_client()
+            logger.info("🔌 Initializing MCP client...")
+            mcp_client = get_mcp_client()
             
             # Fetch available tools from MCP server
-            print("🔧 Fetching available tools from MCP server...")
+            logger.info("🔧 Fetching available tools from MCP server...")
             available_tools = mcp_client.list_tools()
             
             # Filter out search_procedures tool (handled by procedure node)
             available_tools = [tool for tool in available_tools if tool.get("name") != "search_procedures"]
             
-            print(f"✅ Found {len(available_tools)} available tools")
+            logger.info("✅ Found %d available tools", len(available_tools))
             
             # Assign tool types to each tool
             # Currently, the MCP server doesn't return tool types yet, so we assign them manually
@@ -106,23 +132,19 @@ def initialize_node(state: State) -> State:
                     tool["tool_type"] = ToolType.INTERNAL_ACTION.value
                 else:
                     tool["tool_type"] = ToolType.GATHER.value
+                # Schemas don't change within a conversation, so format the prompt block once
+                tool["_prompt_block"] = format_tool_for_prompt(tool)
             
-            print(f"🏷️  Assigned tool types:")
-            for tool in available_tools:
-                print(f"   {tool.get('name')}: {tool.get('tool_type')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🏷️  Assigned tool types:")
+                for tool in available_tools:
+                    logger.debug(f"   {tool.get('name')}: {tool.get('tool_type')}")
             
             # Initialize state with proper values (NO MCP client in state)
             state["available_tools"] = available_tools
-            state["tool_data"] = state.get("tool_data", {})
-            state["docs_data"] = state.get("docs_data", {})
-            state["hops"] = state.get("hops", [])
-            state["max_hops"] = state.get("max_hops", 3)
-            state["actions"] = state.get("actions", [])
-            state["max_actions"] = state.get("max_actions", 1)
-            state["actions_taken"] = state.get("actions_taken", 0)
-            state["response"] = state.get("response", "")
-            state["error"] = state.get("error", None)
-            state["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%SZ")
+            for key, default in _STATE_DEFAULTS.items():
+                state.setdefault(key, default() if callable(default) else default)
+            state["timestamp"] = timestamp
             
             # Store initialize data using Pydantic model
             initialize_data = InitializeData(
@@ -140,26 +162,14 @@ def initialize_node(state: State) -> State:
             state["initialize"] = initialize_data.model_dump()
             
         except Exception as e:
-            print(f"❌ Failed to initialize: {e}")
+            logger.error("❌ Failed to initialize: %s", e)
             error_msg = f"Initialization failed: {str(e)}"
             state["error"] = error_msg
             state["escalation_reason"] = error_msg
             state["response"] = "Sorry, I'm unable to connect to the required services right now."
             
             # Store error in initialize data
-            initialize_data = InitializeData(
-                conversation_id=state.get("conversation_id", ""),
-                messages_count=0,
-                user_name=None,
-                user_email=None,
-                subject=None,
-                tools_count=0,
-                melvin_admin_id="",
-                timestamp=time.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                success=False,
-                error=error_msg
-            )
-            state["initialize"] = initialize_data.model_dump()
+            state["initialize"] = _failed_init(conversation_id, error_msg, timestamp)
     
     return state
 
@@ -2,17 +2,73 @@
 
 import re
 import os
-from typing import Dict, Any, List
+import html
+import json
+import functools
+import time
+from itertools import chain, repeat
+from typing import Dict, Any, FrozenSet, List, Tuple
 from ts_agent.types import State, ToolType
-from .schemas import PlanData, Plan, PlanRequest
+from .schemas import PlanData, Plan, PlanRequest, ToolCall
 from ts_agent.llm import planner_llm
 from src.clients.prompts import get_prompt, PROMPT_NAMES
 from src.utils.prompts import build_conversation_and_user_context, format_procedure_for_prompt
-from jsonschema import validate, ValidationError
+from src.utils.formatting import format_tool_for_prompt
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+from pydantic import TypeAdapter
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Compiled once; serializes a whole list of tool calls in a single call
+_TOOLCALL_LIST_ADAPTER = TypeAdapter(List[ToolCall])
+
+# Name lookup / action tool names / names of tools needing schema validation per
+# available_tools list, keyed by id() and holding the list itself so the id can't be
+# reused while cached
+_TOOLS_INDEX_CACHE: Dict[
+    int, Tuple[List[Dict[str, Any]], Tuple[Dict[str, Any], FrozenSet[str], FrozenSet[str]]]
+] = {}
+
+_ACTION_TOOL_TYPES = frozenset({ToolType.INTERNAL_ACTION.value, ToolType.EXTERNAL_ACTION.value})
+
+# Schema keywords that can't make validation of a params dict fail. "required" is
+# listed because _sanitize_tool_params already rejects missing required params.
+_SCHEMA_PASSIVE_KEYWORDS = frozenset({
+    "type", "properties", "required", "additionalProperties", "$schema", "title", "description"
+})
+_PROPERTY_PASSIVE_KEYWORDS = frozenset({"title", "description", "default", "examples", "$comment"})
+_TOOLS_INDEX_CACHE_SIZE = 8
+
+# Compiled jsonschema validators by tool name, stored with the schema they were built from
+_VALIDATOR_CACHE: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+
+# Fetched prompt templates by name: (fetch time, template)
+_PROMPT_CACHE: Dict[str, Tuple[float, str]] = {}
+_PROMPT_CACHE_TTL_SECONDS = 300
+
+# Max characters of a single parameter value / a whole parameter list in planning context
+_PARAM_REPR_LIMIT = 80
+_PARAMS_REPR_LIMIT = 400
+
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+
+# Intercom message bodies are HTML (e.g. "<p>Hi</p>"); tags are dropped before matching
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+
+# Short standalone greetings ("Hi", "Hello!") never need any tools
+_GREETING_RE = re.compile(
+    r"^\s*(hi|hii+|hello|hey|hiya|howdy|good (morning|afternoon|evening))(\s+there)?[\s!.,]*$",
+    re.IGNORECASE
+)
+
 
 def _validate_and_sanitize_plan(
     plan: Plan, 
@@ -38,8 +94,15 @@ def _validate_and_sanitize_plan(
     Returns:
         Validated and sanitized plan (with invalid tool calls removed)
     """
-    # Create a lookup map for tools
-    tools_map = {tool["name"]: tool for tool in available_tools}
+    # Lookup map for tools (cached per tools list)
+    tools_map, _, tools_needing_validation = _index_tools(available_tools)
+    
+    # Build injection map with trusted values (same for every tool call)
+    injection_map = {
+        "user_email": verified_email,
+        "conversation_id": conversation_id,
+        "dry_run": os.getenv("DRY_RUN", "false").lower() == "true",
+    }
     
     validated_tool_calls = []
     skipped_count = 0
@@ -49,12 +112,10 @@ def _validate_and_sanitize_plan(
         
         # 1. Validate tool exists
         if tool_name not in tools_map:
-            available_names = ", ".join(tools_map.keys())
             logger.warning(
-                f"⚠️  Tool call {i}: Tool '{tool_name}' not found. Skipping. "
-                f"Available tools: {available_names}"
+                "⚠️  Tool call %d: Tool '%s' not found. Skipping. Available tools: %s",
+                i, tool_name, ", ".join(tools_map)
             )
-            print(f"   ⚠️  Skipping invalid tool: {tool_name} (not found)")
             skipped_count += 1
             continue
         
@@ -62,14 +123,6 @@ def _validate_and_sanitize_plan(
         input_schema = tool_schema.get("inputSchema", {})
         
         # 2. Sanitize parameters (inject verified email, conversation_id, etc.)
-        # Build injection map with trusted values
-        import os
-        injection_map = {
-            "user_email": verified_email,
-            "conversation_id": conversation_id,
-            "dry_run": lambda: os.getenv("DRY_RUN", "false").lower() == "true",
-        }
-        
         try:
             sanitized_params = _sanitize_tool_params(
                 tool_call.parameters,
@@ -78,43 +131,112 @@ def _validate_and_sanitize_plan(
                 injection_map
             )
         except Exception as e:
-            logger.warning(f"   ⚠️  Skipping tool {tool_name}: Parameter sanitization failed: {e}")
-            print(f"   ⚠️  Skipping tool {tool_name}: {e}")
+            logger.warning("⚠️  Tool call %d (%s): Parameter sanitization failed - %s. Skipping.", i, tool_name, e)
             skipped_count += 1
             continue
         
-        # 3. Validate parameters against tool's input schema
-        if input_schema and input_schema.get("properties"):
+        # 3. Validate parameters against tool's input schema (skipped when it can't fail)
+        if tool_name in tools_needing_validation:
             try:
-                validate(instance=sanitized_params, schema=input_schema)
+                _get_schema_validator(tool_name, input_schema).validate(sanitized_params)
             except ValidationError as e:
                 logger.warning(
-                    f"⚠️  Tool call {i} ({tool_name}): Parameter validation failed - {e.message}. Skipping."
+                    "⚠️  Tool call %d (%s): Parameter validation failed - %s. Skipping.", i, tool_name, e.message
                 )
-                print(f"   ⚠️  Skipping tool {tool_name}: Invalid parameters ({e.message})")
                 skipped_count += 1
                 continue
         
-        # Create validated tool call with sanitized params
-        from .schemas import ToolCall
-        validated_tool_call = ToolCall(
-            tool_name=tool_name,
-            parameters=sanitized_params,
-            reasoning=tool_call.reasoning
-        )
-        validated_tool_calls.append(validated_tool_call)
+        # Keep the original tool call unless sanitization changed its params
+        if sanitized_params != tool_call.parameters:
+            tool_call = tool_call.model_copy(update={"parameters": sanitized_params})
+        validated_tool_calls.append(tool_call)
     
     # Log summary if any tools were skipped
     if skipped_count > 0:
-        logger.info(f"Validation complete: {len(validated_tool_calls)} valid, {skipped_count} skipped")
+        logger.info("Validation complete: %d valid, %d skipped", len(validated_tool_calls), skipped_count)
+    
+    # Common case: every tool call was valid and already had the trusted values
+    if skipped_count == 0 and all(
+        validated is original for validated, original in zip(validated_tool_calls, plan.tool_calls)
+    ):
+        return plan
+    
+    # Return plan copy with validated tool calls (fields were already validated)
+    return plan.model_copy(update={"tool_calls": validated_tool_calls})
+
+
+def _index_tools(tools: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], FrozenSet[str], FrozenSet[str]]:
+    """
+    Build (name -> tool, action tool names, tools needing validation) lookups for a tools list.
+    
+    The tools list is fixed once initialize has run, so the lookups are built
+    once per list object and reused on every later hop.
+    """
+    cached = _TOOLS_INDEX_CACHE.get(id(tools))
+    if cached is not None and cached[0] is tools:
+        return cached[1]
+    
+    # Single pass over the tools, reading each tool's fields once
+    name_map = {}
+    action_names = set()
+    needs_validation = set()
+    for tool in tools:
+        get = tool.get
+        name = tool["name"]
+        name_map[name] = tool
+        if get("tool_type") in _ACTION_TOOL_TYPES:
+            action_names.add(name)
+        if _schema_requires_validation(get("inputSchema") or {}):
+            needs_validation.add(name)
+    
+    index = (name_map, frozenset(action_names), frozenset(needs_validation))
+    if len(_TOOLS_INDEX_CACHE) >= _TOOLS_INDEX_CACHE_SIZE:
+        _TOOLS_INDEX_CACHE.clear()
+    _TOOLS_INDEX_CACHE[id(tools)] = (tools, index)
+    return index
+
+
+def _schema_requires_validation(input_schema: Dict[str, Any]) -> bool:
+    """
+    Check whether validating params against a tool's input schema could ever fail.
     
-    # Return new plan with validated tool calls
-    return Plan(
-        reasoning=plan.reasoning,
-        tool_calls=validated_tool_calls
+    Schemas without properties, or whose properties only carry annotations
+    (description, default, ...), accept any params dict that passed sanitization.
+    """
+    properties = input_schema.get("properties")
+    if not properties:
+        return False
+    
+    if input_schema.get("type", "object") != "object" or input_schema.get("additionalProperties", True) is not True:
+        return True
+    if not _SCHEMA_PASSIVE_KEYWORDS.issuperset(input_schema):
+        return True
+    
+    return any(
+        not isinstance(prop, dict) or not _PROPERTY_PASSIVE_KEYWORDS.issuperset(prop)
+        for prop in properties.values()
     )
 
 
+def _get_schema_validator(tool_name: str, input_schema: Dict[str, Any]) -> Any:
+    """
+    Get a compiled jsonschema validator for a tool's input schema.
+    
+    The schema itself is checked once when the validator is built instead of on
+    every validation. A cached validator is reused while the tool's schema is
+    unchanged; a different schema for the same tool replaces the entry.
+    """
+    cached = _VALIDATOR_CACHE.get(tool_name)
+    if cached is not None and (cached[0] is input_schema or cached[0] == input_schema):
+        return cached[1]
+    
+    validator_cls = validator_for(input_schema)
+    validator_cls.check_schema(input_schema)
+    validator = validator_cls(input_schema)
+    _VALIDATOR_CACHE[tool_name] = (input_schema, validator)
+    return validator
+
+
 def _sanitize_tool_params(
     params: Dict[str, Any],
     input_schema: Dict[str, Any],
@@ -133,7 +255,7 @@ def _sanitize_tool_params(
         params: Original parameters from LLM
         input_schema: Tool's input schema
         tool_name: Name of the tool
-        injection_map: Dict mapping param names to trusted values (can be callables)
+        injection_map: Dict mapping param names to trusted values
         
     Returns:
         Sanitized parameters with trusted values injected
@@ -149,14 +271,12 @@ def _sanitize_tool_params(
     for param_name in properties.keys():
         # Check if this param should be injected/replaced
         if param_name in injection_map:
-            value = injection_map[param_name]
-            # Handle callable values (like dry_run)
-            sanitized[param_name] = value() if callable(value) else value
+            sanitized[param_name] = injection_map[param_name]
             
             if param_name not in params or params[param_name] != sanitized[param_name]:
-                logger.info(
-                    f"💉 Injected {param_name}={sanitized[param_name]} "
-                    f"(was: {params.get(param_name, 'missing')})"
+                logger.debug(
+                    "💉 Injected %s=%s (was: %s)",
+                    param_name, sanitized[param_name], params.get(param_name, "missing")
                 )
     
     # Validate all required parameters are present
@@ -222,42 +342,41 @@ def plan_node(state: State) -> State:
         # Get selected procedure from state (if any)
         selected_procedure = state.get("selected_procedure")
         
-        # Generate plan using LLM
-        plan = _generate_plan(plan_request, available_tools, selected_procedure)
-        
-        # Get verified email from Intercom (source of truth)
-        user_details = state.get("user_details", {})
-        verified_email = user_details.get("email", "")
-        
-        # Get conversation_id from state
-        conversation_id = state.get("conversation_id", "")
-        
-        # Validate and sanitize the plan (check tool schemas, inject verified parameters)
-        validated_plan = _validate_and_sanitize_plan(plan, available_tools, verified_email, conversation_id)
-        
-        # Separate tool calls by type (gather vs action)
-        gather_tool_calls = []
-        action_tool_calls = []
-        
-        # Create lookup for tool types
-        tools_type_map = {tool["name"]: tool.get("tool_type") for tool in available_tools}
-        
-        for tool_call in validated_plan.tool_calls:
-            tool_type = tools_type_map.get(tool_call.tool_name, ToolType.GATHER.value)
+        # Skip the LLM call entirely when its answer is known to be an empty plan
+        if not available_tools:
+            validated_plan = Plan(reasoning="No tools available", tool_calls=[])
+        elif _is_simple_greeting(state.get("messages", []), state.get("subject")):
+            validated_plan = Plan(reasoning="Simple greeting - no tools needed", tool_calls=[])
+        else:
+            # Generate plan using LLM
+            plan = _generate_plan(plan_request, available_tools, selected_procedure)
             
-            if tool_type in [ToolType.INTERNAL_ACTION.value, ToolType.EXTERNAL_ACTION.value]:
-                action_tool_calls.append(tool_call)
-            else:
-                gather_tool_calls.append(tool_call)
+            # Get verified email from Intercom (source of truth)
+            user_details = state.get("user_details", {})
+            verified_email = user_details.get("email", "")
+            
+            # Get conversation_id from state
+            conversation_id = state.get("conversation_id", "")
+            
+            # Validate and sanitize the plan (check tool schemas, inject verified parameters)
+            validated_plan = _validate_and_sanitize_plan(plan, available_tools, verified_email, conversation_id)
         
         # Store plan in nested structure using PlanData TypedDict
-        # Convert ToolCall objects to dictionaries for state storage
-        tool_calls_dicts = [tc.model_dump() for tc in validated_plan.tool_calls]
-        gather_tool_calls_dicts = [tc.model_dump() for tc in gather_tool_calls]
-        action_tool_calls_dicts = [tc.model_dump() for tc in action_tool_calls]
+        # Convert ToolCall objects to dictionaries for state storage (each serialized once)
+        tool_calls_dicts = _TOOLCALL_LIST_ADAPTER.dump_python(validated_plan.tool_calls)
+        
+        # Separate tool calls by type (gather vs action) in a single pass
+        _, action_tool_names, _ = _index_tools(available_tools)
+        gather_tool_calls_dicts = []
+        action_tool_calls_dicts = []
+        for tool_call in tool_calls_dicts:
+            if tool_call["tool_name"] in action_tool_names:
+                action_tool_calls_dicts.append(tool_call)
+            else:
+                gather_tool_calls_dicts.append(tool_call)
         
         plan_data: PlanData = {
-            "plan": validated_plan.model_dump(),
+            "plan": {"reasoning": validated_plan.reasoning, "tool_calls": tool_calls_dicts},
             "tool_calls": tool_calls_dicts,  # All tools (backward compatibility)
             "gather_tool_calls": gather_tool_calls_dicts,  # Only gather tools
             "action_tool_calls": action_tool_calls_dicts,  # Only action tools
@@ -265,27 +384,29 @@ def plan_node(state: State) -> State:
         }
         hop_data["plan"] = plan_data
         
-        print(f"📋 Plan generated (Hop {current_hop + 1}):")
-        print(f"   📊 Total: {len(validated_plan.tool_calls)} tools")
-        print(f"   🔍 Gather tools: {len(gather_tool_calls)}")
-        print(f"   ⚡ Action tools: {len(action_tool_calls)}")
-        
-        if gather_tool_calls:
-            print(f"\n   Gather tools:")
-            for i, tool_call in enumerate(gather_tool_calls, 1):
-                print(f"      {i}. {tool_call.tool_name} - {tool_call.reasoning}")
+        logger.info(
+            "📋 Plan generated (Hop %d): %d tools (%d gather, %d action)",
+            current_hop + 1, len(validated_plan.tool_calls),
+            len(gather_tool_calls_dicts), len(action_tool_calls_dicts)
+        )
         
-        if action_tool_calls:
-            print(f"\n   Action tools (for coverage to consider):")
-            for i, tool_call in enumerate(action_tool_calls, 1):
-                print(f"      {i}. {tool_call.tool_name} - {tool_call.reasoning}")
+        if logger.isEnabledFor(logging.DEBUG):
+            if gather_tool_calls_dicts:
+                logger.debug("   Gather tools:")
+                for i, tool_call in enumerate(gather_tool_calls_dicts, 1):
+                    logger.debug(f"      {i}. {tool_call['tool_name']} - {tool_call['reasoning']}")
+            
+            if action_tool_calls_dicts:
+                logger.debug("   Action tools (for coverage to consider):")
+                for i, tool_call in enumerate(action_tool_calls_dicts, 1):
+                    logger.debug(f"      {i}. {tool_call['tool_name']} - {tool_call['reasoning']}")
         
     except Exception as e:
         error_msg = f"Plan generation failed: {str(e)}"
         state["error"] = error_msg
         state["escalation_reason"] = error_msg
         state["next_node"] = "escalate"
-        print(f"❌ Plan generation error: {e}")
+        logger.error("❌ Plan generation error: %s", e)
         return state
     
     # Add hop data to hops array
@@ -318,10 +439,13 @@ def _generate_plan(request: PlanRequest, available_tools: List[Dict[str, Any]],
     # Format procedure if available
     procedure_text = format_procedure_for_prompt(selected_procedure)
     
-    # Get prompt from LangSmith
-    prompt_template_text = get_prompt(PROMPT_NAMES["PLAN_NODE"])
+    # Get prompt from LangSmith (cached across hops and conversations)
+    prompt_template_text = _get_plan_prompt(PROMPT_NAMES["PLAN_NODE"])
     
     # Format the prompt with variables
+    # The template keeps instructions and the tool catalog ahead of the per-hop sections
+    # (conversation history, context) so the provider's automatic prompt caching can
+    # reuse the static prefix across hops and conversations.
     formatted_tools = _format_tools_for_prompt(available_tools)
     prompt = prompt_template_text.format(
         conversation_history=conversation_history,
@@ -341,106 +465,162 @@ def _generate_plan(request: PlanRequest, available_tools: List[Dict[str, Any]],
     return plan
 
 
+def _get_plan_prompt(prompt_name: str) -> str:
+    """
+    Get a prompt template, reusing a fetched copy for up to _PROMPT_CACHE_TTL_SECONDS.
+    
+    The TTL keeps edits to the local prompt file or the LangSmith prompt visible
+    without fetching it on every hop.
+    """
+    now = time.monotonic()
+    cached = _PROMPT_CACHE.get(prompt_name)
+    if cached is not None and now - cached[0] < _PROMPT_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    prompt_template_text = get_prompt(prompt_name)
+    _PROMPT_CACHE[prompt_name] = (now, prompt_template_text)
+    return prompt_template_text
+
+
 def _format_tools_for_prompt(tools: List[Dict[str, Any]]) -> str:
     """Format tools for LLM prompt with full schemas."""
-    import json
-    formatted = []
-    
-    for tool in tools:
-        name = tool.get("name", "unknown")
-        description = tool.get("description", "No description available")
-        input_schema = tool.get("inputSchema", {})
-        tool_type = tool.get("tool_type", "gather")  # Get tool type
-        
-        # Format tool with full schema and type
-        tool_str = f"Tool: {name}\n"
-        tool_str += f"Type: {tool_type}\n"  # Add type to prompt
-        tool_str += f"Description: {description}\n"
-        tool_str += f"Input Schema:\n{json.dumps(input_schema, indent=2)}"
-        
-        formatted.append(tool_str)
-    
-    return "\n\n".join(formatted)
+    # Tool blocks are precomputed once by the initialize node; schemas don't change per hop
+    tool_blocks = tuple(
+        tool.get("_prompt_block") or format_tool_for_prompt(tool)
+        for tool in tools
+    )
+    return _join_tool_blocks(tool_blocks)
+
+
+@functools.lru_cache(maxsize=8)
+def _join_tool_blocks(tool_blocks: Tuple[str, ...]) -> str:
+    """Join tool blocks into the prompt catalog, memoized per unique toolset."""
+    return "\n\n".join(tool_blocks)
 
 
 def _build_context_from_hops(hops_array: List[Dict[str, Any]], state: State) -> Dict[str, Any]:
-    """Build context from previous hops for planning."""
+    """
+    Build context from previous hops for planning.
+    
+    Completed hops never change, so their aggregated tool executions, doc searches
+    and coverage analysis are kept in state["context_accum"]. Each call only folds
+    in the hops added since the previous plan instead of rescanning all of them.
+    """
     # Current hop is the next one to plan (len of completed hops + 1)
     current_hop = len(hops_array) + 1
     
-    context = {
+    accum = state.get("context_accum")
+    if not accum or accum.get("hops_processed", 0) > len(hops_array):
+        # First plan of the conversation (or hops were reset) - start from scratch
+        accum = {
+            "hops_processed": 0,
+            "tool_executions": [],  # List of {tool_name, parameters, success, error}
+            "doc_searches": [],  # List of {query, result_count, success}
+            "coverage_analysis": None
+        }
+    
+    # Aggregate data from hops not yet seen by a previous plan
+    for hop in hops_array[accum["hops_processed"]:]:
+        _accumulate_hop_context(hop, accum)
+    accum["hops_processed"] = len(hops_array)
+    state["context_accum"] = accum
+    
+    return {
         "timestamp": state.get("timestamp"),
         "current_hop": current_hop,
         "max_hops": state.get("max_hops", 3),
-        "tool_executions": [],  # List of {tool_name, parameters, success, error}
-        "doc_searches": [],  # List of {query, result_count, success}
-        "coverage_analysis": None
+        "tool_executions": accum["tool_executions"],
+        "doc_searches": accum["doc_searches"],
+        "coverage_analysis": accum["coverage_analysis"]
     }
-    
-    # Aggregate data from all previous hops
-    for hop in hops_array:
-        # Get plan data to extract tool calls with parameters
-        plan_data = hop.get("plan", {})
-        tool_calls_from_plan = plan_data.get("tool_calls", [])
+
+
+def _accumulate_hop_context(hop: Dict[str, Any], accum: Dict[str, Any]) -> None:
+    """Fold a single completed hop into the accumulated planning context."""
+    # Get plan data to extract tool calls with parameters
+    plan_data = hop.get("plan", {})
+    tool_calls_from_plan = plan_data.get("tool_calls", [])
+    
+    # Get gather data to see results
+    gather_data = hop.get("gather", {})
+    if gather_data:
+        tool_results = gather_data.get("tool_results", [])
         
-        # Get gather data to see results
-        gather_data = hop.get("gather", {})
-        if gather_data:
-            tool_results = gather_data.get("tool_results", [])
-            
-            # Match tool results with their plan by index (order matters)
-            for idx, result in enumerate(tool_results):
-                tool_name = result.get("tool_name", "unknown")
-                success = result.get("success", False)
-                error = result.get("error")
-                
-                # Get parameters from the corresponding tool call by index
-                parameters = {}
-                if idx < len(tool_calls_from_plan):
-                    tool_call = tool_calls_from_plan[idx]
-                    # Verify tool names match (sanity check)
-                    if tool_call.get("tool_name") == tool_name:
-                        parameters = tool_call.get("parameters", {})
-                
-                # Special handling for doc searches
-                if tool_name == "search_talent_docs":
-                    query = parameters.get("query", "unknown query")
-                    result_count = 0
-                    if success and result.get("data"):
-                        # Parse result data to get count
-                        data_list = result.get("data", [])
-                        if data_list and isinstance(data_list, list):
-                            for item in data_list:
-                                if isinstance(item, dict) and item.get("type") == "text":
-                                    try:
-                                        import json
-                                        parsed = json.loads(item.get("text", "{}"))
-                                        result_count = parsed.get("total_results", 0)
-                                        break
-                                    except:
-                                        pass
-                    
-                    context["doc_searches"].append({
-                        "query": query,
-                        "result_count": result_count,
-                        "success": success
-                    })
-                else:
-                    # Regular tool execution
-                    context["tool_executions"].append({
-                        "tool_name": tool_name,
-                        "parameters": parameters,
-                        "success": success,
-                        "error": error if not success else None
-                    })
+        # Match tool results with their plan by position (order matters); results
+        # beyond the planned calls get no parameters
+        tool_names = [result.get("tool_name", "unknown") for result in tool_results]
+        executed = [
+            (result, tool_name, _planned_parameters(tool_name, tool_call))
+            for result, tool_name, tool_call in zip(
+                tool_results, tool_names, chain(tool_calls_from_plan, repeat({}))
+            )
+        ]
         
-        # Get coverage data (will be overwritten by latest hop)
-        coverage_data = hop.get("coverage", {})
-        if coverage_data and coverage_data.get("coverage_response"):
-            # Always overwrite with latest hop's coverage analysis (only reasoning will be used)
-            context["coverage_analysis"] = coverage_data["coverage_response"]
-    
-    return context
+        # Doc searches are summarized by result count, everything else by status
+        accum["doc_searches"].extend([
+            _make_doc_search(result, parameters)
+            for result, tool_name, parameters in executed
+            if tool_name == "search_talent_docs"
+        ])
+        accum["tool_executions"].extend([
+            _make_tool_execution(result, tool_name, parameters)
+            for result, tool_name, parameters in executed
+            if tool_name != "search_talent_docs"
+        ])
+    
+    # Get coverage data (will be overwritten by latest hop)
+    coverage_data = hop.get("coverage", {})
+    if coverage_data and coverage_data.get("coverage_response"):
+        # Always overwrite with latest hop's coverage analysis (only reasoning will be used)
+        accum["coverage_analysis"] = coverage_data["coverage_response"]
+
+
+def _planned_parameters(tool_name: str, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+    """Get parameters from the plan's tool call matched to a tool result."""
+    # Verify tool names match (sanity check)
+    if tool_call and tool_call.get("tool_name") == tool_name:
+        return tool_call.get("parameters", {})
+    return {}
+
+
+def _make_doc_search(result: Dict[str, Any], parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a search_talent_docs result as {query, result_count, success}."""
+    success = result.get("success", False)
+    result_count = 0
+    if success and result.get("data"):
+        # Parse result data to get count
+        data_list = result.get("data", [])
+        if data_list and isinstance(data_list, list):
+            for item in data_list:
+                if not isinstance(item, dict) or item.get("type") != "text":
+                    continue
+                # Only JSON objects carry total_results; skip other payloads without raising
+                text = item.get("text")
+                if not isinstance(text, str) or not text.lstrip().startswith("{"):
+                    continue
+                try:
+                    parsed = _json_loads(text)
+                except ValueError:
+                    continue
+                result_count = parsed.get("total_results", 0)
+                break
+    
+    return {
+        "query": parameters.get("query", "unknown query"),
+        "result_count": result_count,
+        "success": success
+    }
+
+
+def _make_tool_execution(result: Dict[str, Any], tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a regular tool result as {tool_name, parameters, success, error}."""
+    success = result.get("success", False)
+    return {
+        "tool_name": tool_name,
+        "parameters": parameters,
+        "success": success,
+        "error": result.get("error") if not success else None
+    }
 
 
 
@@ -450,15 +630,21 @@ def _format_context_for_prompt(context: Dict[str, Any]) -> str:
     if not context:
         return "No previous context available"
     
-    context_parts = []
-    
     # Hop information
-    current_hop = context.get("current_hop", 1)
-    max_hops = context.get("max_hops", 3)
-    context_parts.append(f"- Planning for hop: {current_hop}/{max_hops}")
+    hop_line = f"- Planning for hop: {context.get('current_hop', 1)}/{context.get('max_hops', 3)}"
+    
+    tool_executions = context.get("tool_executions")
+    doc_searches = context.get("doc_searches")
+    coverage_analysis = context.get("coverage_analysis")
+    available_docs = context.get("available_docs")
+    
+    # Nothing gathered yet (typical first hop): the hop line is the whole context
+    if not (tool_executions or doc_searches or coverage_analysis or available_docs):
+        return hop_line
+    
+    context_parts = [hop_line]
     
     # Previous tool executions with signatures
-    tool_executions = context.get("tool_executions", [])
     if tool_executions:
         context_parts.append("\n- Previously executed tools:")
         for execution in tool_executions:
@@ -467,13 +653,14 @@ def _format_context_for_prompt(context: Dict[str, Any]) -> str:
             success = execution.get("success", False)
             error = execution.get("error")
             
-            # Format parameters compactly
-            param_str = ", ".join([f"{k}={repr(v)}" for k, v in params.items()])
+            # Format parameters compactly (bounded so large values don't bloat the prompt)
+            param_str = ", ".join(f"{k}={_short_repr(v)}" for k, v in params.items())
+            if len(param_str) > _PARAMS_REPR_LIMIT:
+                param_str = param_str[:_PARAMS_REPR_LIMIT] + "…"
             status = "✓ SUCCESS" if success else f"✗ FAILED ({error})"
             context_parts.append(f"  * {tool_name}({param_str}) - {status}")
     
     # Previous doc searches with result counts
-    doc_searches = context.get("doc_searches", [])
     if doc_searches:
         context_parts.append("\n- Previously searched documentation:")
         for search in doc_searches:
@@ -484,7 +671,6 @@ def _format_context_for_prompt(context: Dict[str, Any]) -> str:
             context_parts.append(f"  * '{query}' - {status}")
     
     # Coverage analysis results (reasoning and missing data from latest hop)
-    coverage_analysis = context.get("coverage_analysis")
     if coverage_analysis:
         reasoning = coverage_analysis.get('reasoning', '')
         if reasoning:
@@ -500,15 +686,48 @@ def _format_context_for_prompt(context: Dict[str, Any]) -> str:
                 context_parts.append(f"  * {gap_type}: {description}")
     
     # Available docs
-    available_docs = context.get("available_docs", [])
     if available_docs:
         context_parts.append(f"\n- Available documentation collected: {len(available_docs)} searches")
     
-    return "\n".join(context_parts) if context_parts else "No relevant context available"
+    return "\n".join(context_parts)
+
+
+def _short_repr(value: Any, limit: int = _PARAM_REPR_LIMIT) -> str:
+    """Return repr(value), truncated to limit characters."""
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _is_simple_greeting(messages: List[Dict[str, Any]], subject: str = None) -> bool:
+    """Check whether the conversation consists only of short user greetings."""
+    if subject and subject.strip():
+        return False
+    
+    user_messages = [m for m in messages if m.get("role", "user") == "user"]
+    if not user_messages:
+        return False
+    
+    for message in user_messages:
+        content = message.get("content") or ""
+        if message.get("attachments") or not isinstance(content, str):
+            return False
+        text = _plain_text(content)
+        if len(text) >= 15 or not _GREETING_RE.match(text):
+            return False
+    
+    return True
+
+
+def _plain_text(content: str) -> str:
+    """Strip HTML tags and entities from an Intercom message body."""
+    if "<" in content:
+        content = _HTML_TAG_RE.sub(" ", content)
+    if "&" in content:
+        content = html.unescape(content)
+    return content.strip()
 
 
 def _extract_email_from_query(query: str) -> str:
     """Extract email from user query if present."""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    match = re.search(email_pattern, query)
+    match = _EMAIL_RE.search(query)
     return match.group() if match else None
@@ -9,7 +9,7 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from ts_agent.types import State
 from ts_agent.llm import planner_llm
-from src.mcp.factory import create_mcp_client
+from src.mcp.factory import get_mcp_client
 from src.clients.intercom import IntercomClient
 from src.clients.prompts import get_prompt, PROMPT_NAMES
 from .schemas import (
@@ -269,8 +269,8 @@ def _fetch_procedures_from_mcp(query: str, top_k: int = 5) -> List[ProcedureResu
     Returns:
         List of ProcedureResult objects
     """
-    # Create MCP client
-    mcp_client = create_mcp_client()
+    # Get shared MCP client (reused across nodes, so it is not closed here)
+    mcp_client = get_mcp_client()
     
     try:
         # Call search_procedures tool via MCP client
@@ -349,8 +349,6 @@ def _fetch_procedures_from_mcp(query: str, top_k: int = 5) -> List[ProcedureResu
         
     except Exception as e:
         raise ValueError(f"Failed to fetch procedures from MCP API: {str(e)}")
-    finally:
-        mcp_client.close()
 
 
 def _evaluate_procedures(
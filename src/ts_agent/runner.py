@@ -1,13 +1,61 @@
 """Runner for code-first usage of the agent."""
 
+import logging
+import os
+import sys
 import time
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
 from ts_agent.graph import build_graph
 
+# Node logs go to stdout (WARNING by default, override with LOG_LEVEL); no-op if the
+# embedding application already configured logging. Unknown level names fall back to
+# WARNING rather than failing the import.
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+if not isinstance(logging.getLevelName(_LOG_LEVEL), int):
+    _LOG_LEVEL = "WARNING"
+logging.basicConfig(
+    level=_LOG_LEVEL,
+    stream=sys.stdout,
+    format="%(message)s",
+)
+
 _app = build_graph()
 
 
-def run_agent_with_conversation_id(conversation_id: str) -> dict:
+@dataclass(slots=True)
+class AgentResult:
+    """Response and final state snapshot of an agent run."""
+    response: str
+    error: Optional[str]
+    conversation_id: str
+    user_email: Optional[str]
+    messages: List[Dict[str, Any]]
+    # Procedure data (retrieved before loop)
+    selected_procedure: Optional[Dict[str, Any]]
+    procedure_node: Optional[Dict[str, Any]]
+    # Data (independent of hops)
+    tool_data: Dict[str, Any]  # Individual tool results by tool name
+    docs_data: Dict[str, Any]  # Individual docs results by query/topic
+    # Loop management
+    hops: List[Dict[str, Any]]
+    max_hops: int
+    # Action management (state level)
+    actions: List[Dict[str, Any]]  # Action tool executions with audit trail
+    max_actions: int
+    actions_taken: int
+    # Node execution data (state level)
+    draft: Optional[Dict[str, Any]]
+    validate: Optional[Dict[str, Any]]
+    response_delivery: Optional[Dict[str, Any]]
+    escalate: Optional[Dict[str, Any]]
+    finalize: Optional[Dict[str, Any]]
+    # Routing
+    next_node: Optional[str]
+    escalation_reason: Optional[str]
+
+
+def run_agent_with_conversation_id(conversation_id: str) -> AgentResult:
     """
     Run the agent with an Intercom conversation ID.
     
@@ -21,7 +69,7 @@ def run_agent_with_conversation_id(conversation_id: str) -> dict:
         conversation_id: Intercom conversation ID
         
     Returns:
-        Dictionary with response and metadata
+        AgentResult with response and metadata
     """
     # Prepare initial state with conversation ID
     initial_state = {
@@ -31,48 +79,32 @@ def run_agent_with_conversation_id(conversation_id: str) -> dict:
     
     # Run the graph (initialize node will fetch Intercom data)
     final_state = _app.invoke(initial_state)
-    
-    # Extract response
-    response = final_state.get("response", "No response generated")
-    error = final_state.get("error")
-    
-    # Extract data from hops array
-    hops_array = final_state.get("hops", [])
-    
-    # Extract data from state level (independent of hops)
-    tool_data = final_state.get("tool_data", {})
-    docs_data = final_state.get("docs_data", {})
+    get = final_state.get
     
     # Extract user email from user_details
-    user_details = final_state.get("user_details", {})
+    user_details = get("user_details")
     user_email = user_details.get("email") if user_details else None
     
-    return {
-        "response": response,
-        "error": error,
-        "conversation_id": conversation_id,
-        "user_email": user_email,
-        "messages": final_state.get("messages", []),
-        # Procedure data (retrieved before loop)
-        "selected_procedure": final_state.get("selected_procedure"),
-        "procedure_node": final_state.get("procedure_node"),
-        # Data (independent of hops)
-        "tool_data": tool_data,  # Individual tool results by tool name
-        "docs_data": docs_data,  # Individual docs results by query/topic
-        # Loop management
-        "hops": hops_array,
-        "max_hops": final_state.get("max_hops", 3),
-        # Action management (state level)
-        "actions": final_state.get("actions", []),  # Action tool executions with audit trail
-        "max_actions": final_state.get("max_actions", 1),
-        "actions_taken": final_state.get("actions_taken", 0),
-        # Node execution data (state level)
-        "draft": final_state.get("draft"),
-        "validate": final_state.get("validate"),
-        "response_delivery": final_state.get("response_delivery"),
-        "escalate": final_state.get("escalate"),
-        "finalize": final_state.get("finalize"),
-        # Routing
-        "next_node": final_state.get("next_node"),
-        "escalation_reason": final_state.get("escalation_reason")
-    }
+    return AgentResult(
+        response=get("response", "No response generated"),
+        error=get("error"),
+        conversation_id=conversation_id,
+        user_email=user_email,
+        messages=get("messages", []),
+        selected_procedure=get("selected_procedure"),
+        procedure_node=get("procedure_node"),
+        tool_data=get("tool_data", {}),
+        docs_data=get("docs_data", {}),
+        hops=get("hops", []),
+        max_hops=get("max_hops", 3),
+        actions=get("actions", []),
+        max_actions=get("max_actions", 1),
+        actions_taken=get("actions_taken", 0),
+        draft=get("draft"),
+        validate=get("validate"),
+        response_delivery=get("response_delivery"),
+        escalate=get("escalate"),
+        finalize=get("finalize"),
+        next_node=get("next_node"),
+        escalation_reason=get("escalation_reason"),
+    )
@@ -52,6 +52,8 @@ class State(TypedDict, total=False):
     subject: Optional[str]  # Conversation subject/title (fetched from Intercom, often empty)
     melvin_admin_id: Optional[str]  # Melvin bot admin ID for Intercom actions
     timestamp: Optional[str]
+    summary: Optional[str]  # Summary of earlier messages (set upstream for long conversations)
+    max_recent_messages: Optional[int]  # Messages kept verbatim when a summary is present (default: 20)
     
     # MCP Integration
     mcp_client: Optional[Any]  # MCP client instance
@@ -68,6 +70,7 @@ class State(TypedDict, total=False):
     # Loop Management (Plan → Gather → Coverage)
     hops: List[HopData]  # Array of hop data
     max_hops: Optional[int]  # Maximum allowed hops (default: 2)
+    context_accum: Optional[Dict[str, Any]]  # Planning context aggregated from completed hops
     
     # Action Management (separate from hops)
     actions: Optional[List[Dict[str, Any]]]  # List of action executions with audit trail
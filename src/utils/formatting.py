@@ -3,18 +3,29 @@
 import json
 from typing import Any, Dict, List
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib encoder/decoder
+    orjson = None
+    _json_loads = json.loads
+
 
 def format_nested_data(data: Any, indent: int = 0, max_depth: int = 10) -> str:
     """
-    Recursively format nested data structures (dicts, lists, etc.) into readable text.
+    Format nested data structures (dicts, lists, etc.) into readable text.
     
     This is useful for creating human-readable audit trails, notes, or reports
     from structured data like JSON responses from tools.
     
+    Nested structures are walked with an explicit stack and written into a single
+    line buffer, so deep payloads don't hit the recursion limit or re-join
+    intermediate strings at every level.
+    
     Args:
         data: The data to format (can be dict, list, str, int, bool, etc.)
-        indent: Current indentation level (internal use for recursion)
-        max_depth: Maximum recursion depth to prevent infinite loops
+        indent: Indentation level of the top-level structure
+        max_depth: Maximum nesting depth to format
         
     Returns:
         Formatted string with proper indentation and line breaks
@@ -27,11 +38,67 @@ def format_nested_data(data: Any, indent: int = 0, max_depth: int = 10) -> str:
           ID: ABC-123
           URL: ...
     """
+    if not isinstance(data, (dict, list)):
+        return _format_scalar(data, max_depth)
+    
+    lines = []
+    _write_nested_data(data, lines, indent, max_depth)
+    return "\n".join(lines)
+
+
+def _write_nested_data(data: Any, lines: List[str], indent: int = 0, max_depth: int = 10) -> None:
+    """Append the format_nested_data lines for data to an existing line buffer."""
+    # Each entry is either a finished line (str) or a (data, indent, max_depth) block to expand
+    stack = [(data, indent, max_depth)]
+    
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            lines.append(item)
+            continue
+        
+        data, indent, max_depth = item
+        if not isinstance(data, (dict, list)):
+            lines.append(_format_scalar(data, max_depth))
+            continue
+        if max_depth <= 0:
+            lines.append("... (max depth reached)")
+            continue
+        
+        indent_str = "  " * indent
+        
+        # Handle lists
+        if isinstance(data, list):
+            if not data:
+                lines.append("(empty list)")
+                continue
+            entries = [(f"{i}.", value) for i, value in enumerate(data, 1)]
+            separator = " "
+        
+        # Handle dictionaries
+        else:
+            if not data:
+                lines.append("(empty)")
+                continue
+            # Format the key (title case, replace underscores)
+            entries = [(key.replace("_", " ").title(), value) for key, value in data.items()]
+            separator = ": "
+        
+        # Push children in reverse so they pop in their natural order
+        for label, value in reversed(entries):
+            if isinstance(value, (dict, list)):
+                # Nested structure: label line, then the block one level deeper
+                stack.append((value, indent + 1, max_depth - 1))
+                stack.append(f"{indent_str}{label}{separator.rstrip()}")
+            else:
+                stack.append(f"{indent_str}{label}{separator}{_format_scalar(value, max_depth - 1)}")
+
+
+def _format_scalar(data: Any, max_depth: int) -> str:
+    """Format a non-container value for format_nested_data."""
     if max_depth <= 0:
         return "... (max depth reached)"
     
-    indent_str = "  " * indent
-    
     # Handle None
     if data is None:
         return "None"
@@ -51,47 +118,38 @@ def format_nested_data(data: Any, indent: int = 0, max_depth: int = 10) -> str:
             return f"{data[:500]}... (truncated)"
         return data
     
-    # Handle lists
-    if isinstance(data, list):
-        if not data:
-            return "(empty list)"
-        
-        lines = []
-        for i, item in enumerate(data, 1):
-            if isinstance(item, (dict, list)):
-                lines.append(f"{indent_str}{i}.")
-                formatted_item = format_nested_data(item, indent + 1, max_depth - 1)
-                lines.append(formatted_item)
-            else:
-                formatted_item = format_nested_data(item, 0, max_depth - 1)
-                lines.append(f"{indent_str}{i}. {formatted_item}")
-        return "\n".join(lines)
-    
-    # Handle dictionaries
-    if isinstance(data, dict):
-        if not data:
-            return "(empty)"
-        
-        lines = []
-        for key, value in data.items():
-            # Format the key (title case, replace underscores)
-            formatted_key = key.replace("_", " ").title()
-            
-            # Handle nested structures
-            if isinstance(value, (dict, list)):
-                lines.append(f"{indent_str}{formatted_key}:")
-                formatted_value = format_nested_data(value, indent + 1, max_depth - 1)
-                lines.append(formatted_value)
-            else:
-                formatted_value = format_nested_data(value, 0, max_depth - 1)
-                lines.append(f"{indent_str}{formatted_key}: {formatted_value}")
-        
-        return "\n".join(lines)
-    
     # Fallback for other types
     return str(data)
 
 
+def format_tool_for_prompt(tool: Dict[str, Any]) -> str:
+    """
+    Format a single MCP tool (name, type, description and full input schema) for LLM prompts.
+    
+    Args:
+        tool: Tool definition as returned by the MCP server (with assigned tool_type)
+        
+    Returns:
+        Formatted tool block string
+    """
+    get = tool.get
+    name = get("name", "unknown")
+    description = get("description", "No description available")
+    input_schema = get("inputSchema", {})
+    tool_type = get("tool_type", "gather")
+    
+    tool_str = f"Tool: {name}\n"
+    tool_str += f"Type: {tool_type}\n"
+    tool_str += f"Description: {description}\n"
+    if orjson is not None:
+        schema_str = orjson.dumps(input_schema, option=orjson.OPT_INDENT_2).decode()
+    else:
+        schema_str = json.dumps(input_schema, indent=2)
+    tool_str += f"Input Schema:\n{schema_str}"
+    
+    return tool_str
+
+
 def format_action_audit_note(
     action_name: str,
     parameters: Dict[str, Any],
@@ -128,8 +186,7 @@ def format_action_audit_note(
     # Parameters
     if parameters:
         lines.append("**Parameters:**")
-        formatted_params = format_nested_data(parameters, indent=1)
-        lines.append(formatted_params)
+        _write_nested_data(parameters, lines, indent=1)
         lines.append("")
     
     # Error (if failed)
@@ -148,12 +205,11 @@ def format_action_audit_note(
             # MCP tools return results as [{'type': 'text', 'text': '...'}]
             if isinstance(result[0], dict) and 'text' in result[0]:
                 try:
-                    result_data = json.loads(result[0]['text'])
+                    result_data = _json_loads(result[0]['text'])
                 except (json.JSONDecodeError, KeyError):
                     result_data = result[0].get('text', result)
         
-        formatted_result = format_nested_data(result_data, indent=1)
-        lines.append(formatted_result)
+        _write_nested_data(result_data, lines, indent=1)
         lines.append("")
     
     # Footer
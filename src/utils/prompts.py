@@ -2,70 +2,153 @@
 Utility functions for formatting prompts with conversation history and user details.
 """
 
-from typing import List, Dict, Any, Optional
+import functools
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
 
+__all__ = [
+    "format_conversation_history",
+    "format_conversation_history_iter",
+    "format_user_details",
+    "build_conversation_and_user_context",
+    "format_procedure_for_prompt",
+    "convert_messages_to_langchain_with_vision",
+]
 
-def format_conversation_history(messages: List[Dict[str, Any]], subject: Optional[str] = None) -> str:
+# Shared read-only defaults for missing state fields
+_EMPTY: Tuple[Any, ...] = ()
+_EMPTY_DICT: Dict[str, Any] = {}
+
+# Display labels for known roles, so the history loop doesn't call str.title() per message
+_ROLE_DISPLAY = {
+    "user": "User",
+    "assistant": "Assistant",
+    "system": "System",
+    "tool": "Tool",
+    "unknown": "Unknown",
+}
+
+# Attachment line templates (%-formatted, one string built per attachment)
+_ATT_HEAD = "\n   📎 Attachment %d: %s (Type: %s)"
+_ATT_URL = "\n      URL: %s"
+_ATT_SIZE = "\n      Size: %.1f KB"
+_ATT_DIMS = "\n      Dimensions: %sx%s"
+_ATT_INLINE = "📎 Attachment %d: %s (Type: %s, URL: %s)"
+
+# Image MIME types seen in practice; anything else falls back to the image/ prefix check
+_IMAGE_TYPES = frozenset({
+    "image/png", "image/jpeg", "image/jpg", "image/gif",
+    "image/webp", "image/bmp", "image/heic",
+})
+
+
+def _is_image(content_type: Optional[str]) -> bool:
+    """Return True if the attachment content type is an image/* type."""
+    if not isinstance(content_type, str):
+        return False
+    return content_type in _IMAGE_TYPES or content_type.startswith("image/")
+
+
+def format_conversation_history_iter(
+    messages: List[Dict[str, Any]],
+    subject: Optional[str] = None,
+    pre_summary: Optional[str] = None
+) -> Iterator[str]:
     """
-    Format conversation history for LLM prompts.
+    Yield the formatted conversation history one entry at a time.
+    
+    Entries are the subject header, the "Conversation:" header and then one entry per
+    message with its attachment information inlined. Joining the entries with newlines
+    gives exactly the output of format_conversation_history, so callers that stream
+    the prompt can consume this without materializing the whole history.
     
     Args:
         messages: List of conversation messages with role, content, and optional attachments
         subject: Optional conversation subject/title
+        pre_summary: Optional summary of earlier messages, emitted before everything else
         
-    Returns:
-        Formatted conversation history string including attachment information
+    Yields:
+        Formatted history entries
     """
-    parts = []
+    # Summary of messages that were trimmed from the history
+    if pre_summary:
+        yield f"Prior summary:\n{pre_summary}\n"
     
     # Add subject if available
     if subject:
-        parts.append(f"Subject: {subject}\n")
+        yield f"Subject: {subject}\n"
+    
+    if not messages:
+        yield "Conversation: No messages available"
+        return
     
     # Add messages
-    if messages:
-        parts.append("Conversation:")
-        for i, message in enumerate(messages, 1):
-            role = message.get("role", "unknown").title()
-            content = message.get("content", "")
-            parts.append(f"{i}. {role}: {content}")
+    yield "Conversation:"
+    role_display = _ROLE_DISPLAY
+    for i, message in enumerate(messages, 1):
+        msg_get = message.get
+        role = msg_get("role", "unknown")
+        entry = f"{i}. {role_display.get(role) or role.title()}: {msg_get('content', '')}"
+        
+        # Add attachment information if present (text-only messages skip this entirely)
+        attachments = msg_get("attachments")
+        if not attachments:
+            yield entry
+            continue
+        
+        lines = [entry]
+        for j, attachment in enumerate(attachments, 1):
+            ag = attachment.get
+            att_url = ag("url", "")
+            
+            # Format attachment info for LLM
+            line = _ATT_HEAD % (j, ag("name", "Unknown file"), ag("content_type", "unknown"))
+            
+            # Include URL so LLM knows it's accessible
+            if att_url:
+                line += _ATT_URL % att_url
+            
+            # Add file size if available
+            if "filesize" in attachment:
+                line += _ATT_SIZE % (attachment["filesize"] / 1024)
             
-            # Add attachment information if present
-            attachments = message.get("attachments", [])
-            if attachments:
-                for j, attachment in enumerate(attachments, 1):
-                    att_name = attachment.get("name", "Unknown file")
-                    att_type = attachment.get("content_type", "unknown")
-                    att_url = attachment.get("url", "")
-                    
-                    # Format attachment info for LLM
-                    att_info = f"   📎 Attachment {j}: {att_name} (Type: {att_type})"
-                    
-                    # Include URL so LLM knows it's accessible
-                    if att_url:
-                        att_info += f"\n      URL: {att_url}"
-                    
-                    # Add file size if available
-                    if "filesize" in attachment:
-                        filesize_kb = attachment["filesize"] / 1024
-                        att_info += f"\n      Size: {filesize_kb:.1f} KB"
-                    
-                    # Add dimensions for images
-                    if "width" in attachment and "height" in attachment:
-                        att_info += f"\n      Dimensions: {attachment['width']}x{attachment['height']}"
-                    
-                    parts.append(att_info)
-    else:
-        parts.append("Conversation: No messages available")
-    
-    return "\n".join(parts)
+            # Add dimensions for images
+            if "width" in attachment and "height" in attachment:
+                line += _ATT_DIMS % (attachment["width"], attachment["height"])
+            
+            lines.append(line)
+        
+        yield "".join(lines)
 
 
+def format_conversation_history(
+    messages: List[Dict[str, Any]],
+    subject: Optional[str] = None,
+    pre_summary: Optional[str] = None
+) -> str:
+    """
+    Format conversation history for LLM prompts.
+    
+    Args:
+        messages: List of conversation messages with role, content, and optional attachments
+        subject: Optional conversation subject/title
+        pre_summary: Optional summary of earlier messages, prepended as "Prior summary:"
+        
+    Returns:
+        Formatted conversation history string including attachment information
+    """
+    return "\n".join(format_conversation_history_iter(messages, subject, pre_summary))
+
+
+@functools.lru_cache(maxsize=1024)
 def format_user_details(name: Optional[str] = None, email: Optional[str] = None) -> str:
     """
     Format user details for LLM prompts.
     
+    Results are cached per (name, email) for the life of the process, since the
+    same user is formatted on every plan/coverage/draft pass. The cache is
+    bounded, but arguments must be hashable.
+    
     Args:
         name: User's name
         email: User's email
@@ -73,26 +156,48 @@ def format_user_details(name: Optional[str] = None, email: Optional[str] = None)
     Returns:
         Formatted user details string
     """
-    parts = []
+    lines = _render_user_block(name, email)
+    if not lines:
+        return "User details: Not available"
     
-    if name:
-        parts.append(f"Name: {name}")
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_user_block(
+    name: Optional[str],
+    email: Optional[str],
+    indent: str = ""
+) -> Tuple[str, ...]:
+    """
+    Render the Name/Email lines shared by the prompt and vision context formatters.
     
+    Args:
+        name: User's name
+        email: User's email
+        indent: Prefix for each line
+        
+    Returns:
+        Tuple of rendered lines (empty if neither name nor email is set)
+    """
+    lines = []
+    if name:
+        lines.append(f"{indent}Name: {name}")
     if email:
-        parts.append(f"Email: {email}")
-    
-    if not parts:
-        parts.append("User details: Not available")
-    
-    return "\n".join(parts)
+        lines.append(f"{indent}Email: {email}")
+    return tuple(lines)
 
 
 def build_conversation_and_user_context(state: Dict[str, Any]) -> Dict[str, str]:
     """
     Build formatted conversation history and user details from state.
     
+    When the state carries a summary of earlier messages, only the last
+    max_recent_messages (default 20) are formatted verbatim and the summary is
+    prepended. Without a summary the full history is used.
+    
     Args:
-        state: Agent state containing messages, subject, and user_details
+        state: Agent state containing messages, subject, user_details and optionally summary
         
     Returns:
         Dictionary with formatted conversation_history and user_details strings
@@ -100,22 +205,29 @@ def build_conversation_and_user_context(state: Dict[str, Any]) -> Dict[str, str]
     Raises:
         ValueError: If both messages and subject are missing from state
     """
-    messages = state.get("messages", [])
+    messages = state.get("messages") or _EMPTY
     subject = state.get("subject")
     
     # Validate: Either messages or subject must be present
-    has_messages = messages and len(messages) > 0
-    has_subject = subject and subject.strip()
+    has_messages = bool(messages)
+    has_subject = bool(subject) and not subject.isspace()
     
     if not has_messages and not has_subject:
         raise ValueError("No conversation messages or subject found in state")
     
-    user_details = state.get("user_details", {})
-    user_name = user_details.get("name") if user_details else None
-    user_email = user_details.get("email") if user_details else None
+    user_details = state.get("user_details") or _EMPTY_DICT
+    user_name = user_details.get("name")
+    user_email = user_details.get("email")
+    
+    # Replace older messages with the upstream summary, if one was produced
+    summary = state.get("summary")
+    if summary:
+        max_recent = state.get("max_recent_messages") or 20
+        if len(messages) > max_recent:
+            messages = messages[-max_recent:]
     
     return {
-        "conversation_history": format_conversation_history(messages, subject),
+        "conversation_history": format_conversation_history(messages, subject, summary),
         "user_details": format_user_details(user_name, user_email)
     }
 
@@ -153,6 +265,36 @@ def format_procedure_for_prompt(selected_procedure: Optional[Dict[str, Any]] = N
     return procedure_text
 
 
+@functools.lru_cache(maxsize=256)
+def _build_context_text(
+    subject: Optional[str],
+    user_name: Optional[str],
+    user_email: Optional[str]
+) -> str:
+    """
+    Build the subject/user context block prepended to the first converted message.
+    
+    Args:
+        subject: Optional conversation subject
+        user_name: Optional user name
+        user_email: Optional user email
+        
+    Returns:
+        Context block ending in a "---" separator, or an empty string if there is no context
+    """
+    context_parts = []
+    if subject:
+        context_parts.append(f"Subject: {subject}")
+    user_lines = _render_user_block(user_name, user_email, "  ")
+    if user_lines:
+        context_parts.append("User Details:")
+        context_parts.extend(user_lines)
+    
+    if not context_parts:
+        return ""
+    return "\n".join(context_parts) + "\n\n---\n\n"
+
+
 def convert_messages_to_langchain_with_vision(
     messages: List[Dict[str, Any]], 
     subject: Optional[str] = None,
@@ -181,91 +323,109 @@ def convert_messages_to_langchain_with_vision(
         >>> lc_messages = convert_messages_to_langchain_with_vision(messages)
         >>> # Can now be used with: llm.invoke(lc_messages)
     """
-    langchain_messages = []
-    
     # Add context as a system-like message (using HumanMessage as first message)
-    context_parts = []
-    if subject:
-        context_parts.append(f"Subject: {subject}")
-    if user_name or user_email:
-        context_parts.append("User Details:")
-        if user_name:
-            context_parts.append(f"  Name: {user_name}")
-        if user_email:
-            context_parts.append(f"  Email: {user_email}")
+    context_text = _build_context_text(subject, user_name, user_email)
     
-    if context_parts:
-        # Prepend context to first message or create a separate context message
-        context_text = "\n".join(context_parts) + "\n\n---\n\n"
-    else:
-        context_text = ""
+    # Most conversations are plain text; skip the attachment handling entirely for them
+    if not any(m.get("attachments") for m in messages):
+        return _convert_text_messages_to_langchain(messages, context_text)
+    
+    # One slot per input message, filled by index below
+    langchain_messages: List[BaseMessage] = [None] * len(messages)
+    human_message = HumanMessage
+    ai_message = AIMessage
     
     # Convert each message
     for i, message in enumerate(messages):
-        role = message.get("role", "user")
-        content_text = message.get("content", "")
-        attachments = message.get("attachments", [])
+        msg_get = message.get
+        role = msg_get("role", "user")
+        content_text = msg_get("content", "")
+        attachments = msg_get("attachments") or ()
         
         # Prepend context to first message
         if i == 0 and context_text:
             content_text = context_text + content_text
         
-        # Check if there are image attachments
-        has_images = any(
-            att.get("content_type", "").startswith("image/")
-            for att in attachments
-        )
+        # Single pass over attachments: collect image parts and, in case there turn out
+        # to be no images, the text lines describing each attachment
+        has_images = False
+        image_urls = []
+        attachment_info = []
+        for j, att in enumerate(attachments, 1):
+            ag = att.get
+            # Classify once; the content type is reused for the text fallback below
+            content_type = ag("content_type")
+            if _is_image(content_type):
+                has_images = True
+                url = ag("url", "")
+                if url:
+                    image_urls.append(url)
+            elif not has_images:
+                attachment_info.append(_ATT_INLINE % (
+                    j,
+                    ag("name", "Unknown file"),
+                    "unknown" if content_type is None else content_type,
+                    ag("url", ""),
+                ))
         
-        if has_images:
-            # Create structured content with text and images
-            content_array = []
-            
-            # Add text content
-            if content_text:
-                content_array.append({
-                    "type": "text",
-                    "text": content_text
-                })
-            
-            # Add each image attachment
-            for attachment in attachments:
-                content_type = attachment.get("content_type", "")
-                if content_type.startswith("image/"):
-                    url = attachment.get("url", "")
-                    if url:
-                        content_array.append({
-                            "type": "image_url",
-                            "image_url": {
-                                "url": url,
-                                "detail": "auto"  # Can be "low", "high", or "auto"
-                            }
-                        })
-            
-            # Create message with structured content
-            if role == "assistant":
-                # Note: AIMessage doesn't support image content, so we keep it as text
-                # Images in assistant messages are rare anyway
-                langchain_messages.append(AIMessage(content=content_text))
-            else:
-                langchain_messages.append(HumanMessage(content=content_array))
-        else:
+        if not has_images:
             # Regular text-only message
             # Include non-image attachment info in text
-            if attachments:
-                attachment_info = []
-                for j, att in enumerate(attachments, 1):
-                    att_name = att.get("name", "Unknown file")
-                    att_type = att.get("content_type", "unknown")
-                    att_url = att.get("url", "")
-                    attachment_info.append(
-                        f"📎 Attachment {j}: {att_name} (Type: {att_type}, URL: {att_url})"
-                    )
-                if attachment_info:
-                    content_text = content_text + "\n\n" + "\n".join(attachment_info)
-            
-            if role == "assistant":
-                langchain_messages.append(AIMessage(content=content_text))
-            else:
-                langchain_messages.append(HumanMessage(content=content_text))
+            if attachment_info:
+                content_text = content_text + "\n\n" + "\n".join(attachment_info)
+        
+        if role == "assistant":
+            # Note: AIMessage doesn't support image content, so we keep it as text
+            # Images in assistant messages are rare anyway
+            langchain_messages[i] = ai_message(content=content_text)
+        elif has_images:
+            # Create structured content with text and images; the image_url parts are
+            # only built here, since assistant messages drop them
+            content_array = [{"type": "text", "text": content_text}] if content_text else []
+            content_array.extend(
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": url,
+                        "detail": "auto"  # Can be "low", "high", or "auto"
+                    }
+                }
+                for url in image_urls
+            )
+            langchain_messages[i] = human_message(content=content_array)
+        else:
+            langchain_messages[i] = human_message(content=content_text)
+    
+    return langchain_messages
+
+
+def _convert_text_messages_to_langchain(
+    messages: List[Dict[str, Any]],
+    context_text: str
+) -> List[BaseMessage]:
+    """
+    Convert attachment-free messages to LangChain messages with plain text content.
+    
+    Args:
+        messages: List of conversation messages with role and content
+        context_text: Context block to prepend to the first message (may be empty)
+        
+    Returns:
+        List of LangChain messages (HumanMessage/AIMessage)
+    """
+    langchain_messages: List[BaseMessage] = [None] * len(messages)
+    human_message = HumanMessage
+    ai_message = AIMessage
+    
+    for i, message in enumerate(messages):
+        msg_get = message.get
+        content_text = msg_get("content", "")
+        if i == 0 and context_text:
+            content_text = context_text + content_text
+        
+        if msg_get("role", "user") == "assistant":
+            langchain_messages[i] = ai_message(content=content_text)
+        else:
+            langchain_messages[i] = human_message(content=content_text)
     
     return langchain_messages
@@ -1,6 +1,118 @@
 import pytest
+from langchain_core.messages import AIMessage
+
+from ts_agent.nodes.coverage.schemas import CoverageResponse
+from ts_agent.nodes.draft.schemas import DraftResponse, ResponseType
+from ts_agent.nodes.plan.schemas import Plan
+from ts_agent.nodes.procedure.schemas import ProcedureEvaluation, QueryGeneration
+
+# Modules that bind an LLM factory by name, and the factory names they import
+_LLM_FACTORY_SITES = {
+    "ts_agent.llm": ("planner_llm", "drafter_llm"),
+    "ts_agent.nodes.plan.plan": ("planner_llm",),
+    "ts_agent.nodes.procedure.procedure": ("planner_llm",),
+    "ts_agent.nodes.coverage.coverage": ("planner_llm",),
+    "ts_agent.nodes.draft.draft": ("drafter_llm",),
+}
+
+
+def _default_responses() -> dict:
+    """Canned structured outputs: an empty plan, sufficient coverage and a plain reply."""
+    return {
+        Plan: Plan(reasoning="stub plan", tool_calls=[]),
+        CoverageResponse: CoverageResponse(
+            data_sufficient=True, reasoning="stub coverage", confidence=1.0, next_action="continue"
+        ),
+        DraftResponse: DraftResponse(response="ok", response_type=ResponseType.REPLY),
+        QueryGeneration: QueryGeneration(query="stub query", reasoning="stub"),
+        ProcedureEvaluation: ProcedureEvaluation(is_match=False, reasoning="stub"),
+    }
+
+
+class _StubLLM:
+    """Stand-in chat model.
+
+    Plain calls answer with a canned AIMessage. with_structured_output(schema) answers
+    with a copy of the instance registered for schema in `responses`, which tests can
+    replace to steer a node.
+    """
+
+    def __init__(self, content: str = "ok"):
+        self.content = content
+        self.responses = _default_responses()
+        self.calls = []  # Schemas (or None for plain calls) in invocation order
+
+    def invoke(self, *args, **kwargs):
+        self.calls.append(None)
+        return AIMessage(content=self.content)
+
+    async def ainvoke(self, *args, **kwargs):
+        return self.invoke(*args, **kwargs)
+
+    def with_structured_output(self, schema, **kwargs):
+        return _StubStructuredLLM(self, schema)
+
+    def bind_tools(self, *args, **kwargs):
+        return self
+
+
+class _StubStructuredLLM:
+    """Structured-output view of a _StubLLM for a single schema."""
+
+    def __init__(self, llm: _StubLLM, schema):
+        self.llm = llm
+        self.schema = schema
+
+    def invoke(self, *args, **kwargs):
+        try:
+            response = self.llm.responses[self.schema]
+        except KeyError:
+            raise LookupError(f"mock_llm has no canned response for {self.schema.__name__}") from None
+        self.llm.calls.append(self.schema)
+        # Nodes mutate the returned model, so every call gets its own copy
+        return response.model_copy(deep=True)
+
+    async def ainvoke(self, *args, **kwargs):
+        return self.invoke(*args, **kwargs)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow",
+        action="store_true",
+        default=False,
+        help="run slow tests that call real LLMs and external services",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: calls real LLMs/services; only runs with --runslow")
+    config.addinivalue_line("markers", "langsmith: traced with LangSmith")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
 
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def mock_llm(request, monkeypatch):
+    """Replace the LLM factories with a stub unless running with --runslow."""
+    if request.config.getoption("--runslow"):
+        yield None
+        return
+
+    stub = _StubLLM()
+    for module, names in _LLM_FACTORY_SITES.items():
+        for name in names:
+            monkeypatch.setattr(f"{module}.{name}", lambda *args, **kwargs: stub)
+    yield stub
@@ -0,0 +1,78 @@
+import json
+
+from ts_agent.nodes.coverage.coverage import coverage_node
+from ts_agent.nodes.coverage.schemas import CoverageResponse
+from ts_agent.nodes.draft.draft import draft_node
+from ts_agent.nodes.draft.schemas import DraftResponse
+from ts_agent.nodes.gather.gather import gather_node
+from ts_agent.nodes.plan.plan import plan_node
+from ts_agent.nodes.plan.schemas import Plan, ToolCall
+
+
+class _FakeMCPClient:
+    """Records tool calls and answers like the MCP server's text content."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call_tool(self, tool_name, arguments, timeout=30.0):
+        self.calls.append((tool_name, arguments))
+        applications = [{"listing_title": "Engineer", "status": "In review", "applied_at": "2025-01-01"}]
+        return [{"type": "text", "text": json.dumps({"applications": applications})}]
+
+
+def test_plan_gather_coverage_draft_with_stub_llm(mock_llm, monkeypatch) -> None:
+    """One hop through plan → gather → coverage → draft runs entirely on the stub LLM."""
+    mcp_client = _FakeMCPClient()
+    monkeypatch.setattr("ts_agent.nodes.gather.gather.get_mcp_client", lambda: mcp_client)
+    mock_llm.responses[Plan] = Plan(
+        reasoning="Look up the user's applications",
+        tool_calls=[
+            ToolCall(
+                tool_name="get_user_applications",
+                parameters={"user_email": "made-up@example.com"},
+                reasoning="status question",
+            )
+        ],
+    )
+    state = {
+        "conversation_id": "123",
+        "messages": [{"role": "user", "content": "<p>What is the status of my application?</p>"}],
+        "user_details": {"name": "Sam", "email": "sam@example.com"},
+        "available_tools": [{
+            "name": "get_user_applications",
+            "tool_type": "gather",
+            "description": "List a user's applications",
+            "inputSchema": {
+                "type": "object",
+                "properties": {"user_email": {"type": "string"}},
+                "required": ["user_email"],
+            },
+        }],
+        "hops": [],
+        "max_hops": 2,
+        "actions_taken": 0,
+        "max_actions": 1,
+    }
+
+    state = plan_node(state)
+    assert "error" not in state
+    assert state["hops"][0]["plan"]["gather_tool_calls"][0]["parameters"] == {"user_email": "sam@example.com"}
+
+    state = gather_node(state)
+    assert "error" not in state
+    assert mcp_client.calls == [("get_user_applications", {"user_email": "sam@example.com"})]
+    assert state["tool_data"]["get_user_applications"]["applications"][0]["status"] == "In review"
+
+    state = coverage_node(state)
+    assert "error" not in state
+    assert state["next_node"] == "respond"
+    assert state["hops"][0]["coverage"]["coverage_response"]["reasoning"] == "stub coverage"
+
+    state = draft_node(state)
+    assert "error" not in state
+    assert state["next_node"] == "validate"
+    assert state["response"] == "ok"
+    assert state["draft"]["response_type"] == "REPLY"
+
+    assert mock_llm.calls == [Plan, CoverageResponse, DraftResponse]
@@ -0,0 +1,199 @@
+import json
+
+import pytest
+
+from ts_agent.nodes.plan.plan import (
+    _build_context_from_hops,
+    _is_simple_greeting,
+    _sanitize_tool_params,
+    _schema_requires_validation,
+    _validate_and_sanitize_plan,
+    plan_node,
+)
+from ts_agent.nodes.plan.schemas import Plan, ToolCall
+
+
+def _hop(hop_number: int, with_docs: bool = False) -> dict:
+    """Build a completed hop with one regular tool call and optionally a docs search."""
+    tool_calls = [
+        {"tool_name": "get_user_applications", "parameters": {"email": f"u{hop_number}@x.com"}, "reasoning": "r"},
+    ]
+    tool_results = [
+        {"tool_name": "get_user_applications", "success": hop_number % 2 == 1, "error": "boom", "data": []},
+    ]
+    if with_docs:
+        tool_calls.append(
+            {"tool_name": "search_talent_docs", "parameters": {"query": f"q{hop_number}"}, "reasoning": "r"}
+        )
+        tool_results.append({
+            "tool_name": "search_talent_docs",
+            "success": True,
+            "data": [{"type": "text", "text": json.dumps({"total_results": hop_number})}],
+        })
+    # A result without a matching planned call gets no parameters
+    tool_results.append({"tool_name": "unplanned_tool", "success": True, "data": []})
+    return {
+        "hop_number": hop_number,
+        "plan": {"tool_calls": tool_calls},
+        "gather": {"tool_results": tool_results},
+        "coverage": {"coverage_response": {"reasoning": f"coverage {hop_number}", "missing_data": []}},
+    }
+
+
+def test_context_from_hops_incremental_matches_full_rebuild() -> None:
+    """Folding hops in one at a time gives the same context as a single full build."""
+    hops = [_hop(1, with_docs=True), _hop(2), _hop(3, with_docs=True)]
+
+    state = {"max_hops": 3}
+    for n in range(len(hops) + 1):
+        incremental = _build_context_from_hops(hops[:n], state)
+        full = _build_context_from_hops(hops[:n], {"max_hops": 3})
+        assert incremental == full
+        assert state["context_accum"]["hops_processed"] == n
+
+    assert [e["tool_name"] for e in full["tool_executions"]] == [
+        "get_user_applications", "unplanned_tool",
+    ] * 3
+    assert full["tool_executions"][1]["parameters"] == {}
+    assert full["doc_searches"] == [
+        {"query": "q1", "result_count": 1, "success": True},
+        {"query": "q3", "result_count": 3, "success": True},
+    ]
+    assert full["coverage_analysis"]["reasoning"] == "coverage 3"
+    assert full["current_hop"] == 4
+
+
+def test_context_from_hops_resets_when_hops_cleared() -> None:
+    """An accumulator covering more hops than the state has is rebuilt from scratch."""
+    state = {}
+    _build_context_from_hops([_hop(1, with_docs=True), _hop(2)], state)
+    assert state["context_accum"]["hops_processed"] == 2
+
+    context = _build_context_from_hops([], state)
+
+    assert context["tool_executions"] == []
+    assert context["doc_searches"] == []
+    assert context["coverage_analysis"] is None
+    assert context["current_hop"] == 1
+    assert state["context_accum"]["hops_processed"] == 0
+
+
+def test_is_simple_greeting_matches_html_bodies() -> None:
+    """Intercom HTML bodies are reduced to plain text before matching greetings."""
+    assert _is_simple_greeting([{"role": "user", "content": "<p>Hi</p>"}])
+    assert _is_simple_greeting([{"role": "user", "content": "<p>Hello&nbsp;there!</p>"}])
+    assert _is_simple_greeting([
+        {"role": "user", "content": "hey"},
+        {"role": "assistant", "content": "<p>Hi! How can I help you today?</p>"},
+    ])
+
+
+def test_is_simple_greeting_rejects_real_requests() -> None:
+    """Anything beyond a bare greeting still goes to the planner."""
+    assert not _is_simple_greeting([{"role": "user", "content": "<p>Hi, where is my application?</p>"}])
+    assert not _is_simple_greeting([{"role": "user", "content": "<p>Hi</p>"}], subject="Payment issue")
+    assert not _is_simple_greeting([
+        {"role": "user", "content": "<p>Hi</p>", "attachments": [{"content_type": "image/png"}]}
+    ])
+    assert not _is_simple_greeting([{"role": "user", "content": None}])
+    assert not _is_simple_greeting([{"role": "assistant", "content": "Hi"}])
+    assert not _is_simple_greeting([])
+
+
+def _fail_generate_plan(*args, **kwargs):
+    raise AssertionError("the planner LLM should not be called")
+
+
+def test_plan_node_skips_llm_without_tools(monkeypatch) -> None:
+    """With no available tools the plan is empty and the LLM is never called."""
+    monkeypatch.setattr("ts_agent.nodes.plan.plan._generate_plan", _fail_generate_plan)
+    state = {
+        "messages": [{"role": "user", "content": "<p>Where is my application?</p>"}],
+        "available_tools": [],
+        "hops": [],
+    }
+
+    state = plan_node(state)
+
+    assert "error" not in state
+    plan = state["hops"][-1]["plan"]
+    assert plan["tool_calls"] == []
+    assert plan["reasoning"] == "No tools available"
+
+
+def test_plan_node_skips_llm_for_html_greeting(monkeypatch) -> None:
+    """A bare greeting produces an empty plan without calling the LLM."""
+    monkeypatch.setattr("ts_agent.nodes.plan.plan._generate_plan", _fail_generate_plan)
+    state = {
+        "messages": [{"role": "user", "content": "<p>Hello!</p>"}],
+        "available_tools": [{"name": "get_user_applications", "tool_type": "gather", "inputSchema": {}}],
+        "hops": [],
+    }
+
+    state = plan_node(state)
+
+    assert "error" not in state
+    assert state["hops"][-1]["plan"]["tool_calls"] == []
+
+
+@pytest.mark.parametrize("schema", [
+    {"type": "object", "properties": {"count": {"type": "integer"}}},
+    {"type": "object", "properties": {"q": {"description": "query"}}, "additionalProperties": False},
+    {"type": "object", "properties": {"q": {"$ref": "#/$defs/q"}}, "$defs": {"q": {"type": "string"}}},
+    {"$defs": {"q": {"type": "string"}}, "properties": {"q": {"description": "query"}}},
+    {"properties": {"q": {"description": "query"}}, "anyOf": [{"required": ["q"]}]},
+    {"type": "array", "properties": {"q": {"description": "query"}}},
+])
+def test_schema_requires_validation_for_constraining_schemas(schema) -> None:
+    """Schemas that can reject a params dict are always validated."""
+    assert _schema_requires_validation(schema)
+
+
+@pytest.mark.parametrize("schema", [
+    {},
+    {"type": "object", "properties": {}},
+    {
+        "type": "object",
+        "title": "Search",
+        "properties": {"q": {"title": "Q", "description": "query", "default": "", "examples": ["a"]}},
+        "required": ["q"],
+        "additionalProperties": True,
+    },
+])
+def test_schema_requires_validation_skips_annotation_only_schemas(schema) -> None:
+    """Schemas whose properties only carry annotations can't fail, so validation is skipped."""
+    assert not _schema_requires_validation(schema)
+
+
+def _plan_for(tool_name: str, parameters: dict) -> Plan:
+    return Plan(reasoning="r", tool_calls=[ToolCall(tool_name=tool_name, parameters=parameters, reasoning="r")])
+
+
+def test_validate_plan_drops_calls_failing_schema_validation() -> None:
+    """Typed and closed schemas still reject bad LLM-generated parameters."""
+    tools = [
+        {"name": "typed_tool", "inputSchema": {"type": "object", "properties": {"count": {"type": "integer"}}}},
+        {
+            "name": "closed_tool",
+            "inputSchema": {"type": "object", "properties": {"q": {}}, "additionalProperties": False},
+        },
+    ]
+
+    bad_type = _validate_and_sanitize_plan(_plan_for("typed_tool", {"count": "many"}), tools, "", "")
+    extra_param = _validate_and_sanitize_plan(_plan_for("closed_tool", {"q": "a", "x": 1}), tools, "", "")
+    good = _plan_for("typed_tool", {"count": 3})
+
+    assert bad_type.tool_calls == []
+    assert extra_param.tool_calls == []
+    assert _validate_and_sanitize_plan(good, tools, "", "") is good
+
+
+def test_missing_required_param_rejected_without_schema_validation() -> None:
+    """Annotation-only schemas skip jsonschema, but required params are still enforced."""
+    schema = {"type": "object", "properties": {"q": {"description": "query"}}, "required": ["q"]}
+    tools = [{"name": "annotated_tool", "inputSchema": schema}]
+
+    with pytest.raises(ValueError, match="Missing required parameters for annotated_tool: q"):
+        _sanitize_tool_params({}, schema, "annotated_tool", {})
+    assert _validate_and_sanitize_plan(_plan_for("annotated_tool", {}), tools, "", "").tool_calls == []
+    assert len(_validate_and_sanitize_plan(_plan_for("annotated_tool", {"q": "a"}), tools, "", "").tool_calls) == 1
@@ -0,0 +1,48 @@
+from src.utils.prompts import build_conversation_and_user_context
+
+
+def _messages(n: int) -> list:
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(n)]
+
+
+def _history_lines(history: str) -> list:
+    return history.split("Conversation:\n", 1)[1].split("\n")
+
+
+def test_summary_replaces_messages_beyond_recent_window() -> None:
+    """With a summary, only the last 20 messages are kept and the summary is prepended."""
+    state = {"messages": _messages(25), "summary": "User asked about payments.", "subject": "Payments"}
+
+    history = build_conversation_and_user_context(state)["conversation_history"]
+
+    assert history.startswith("Prior summary:\nUser asked about payments.\n\nSubject: Payments\n\nConversation:\n")
+    lines = _history_lines(history)
+    assert len(lines) == 20
+    assert lines[0] == "1. Assistant: message 5"
+    assert lines[-1] == "20. User: message 24"
+
+
+def test_history_untouched_without_summary() -> None:
+    """Without a summary the full history is formatted, even past the recent window."""
+    state = {"messages": _messages(25), "max_recent_messages": 3}
+
+    history = build_conversation_and_user_context(state)["conversation_history"]
+
+    assert "Prior summary:" not in history
+    lines = _history_lines(history)
+    assert len(lines) == 25
+    assert lines[0] == "1. User: message 0"
+
+
+def test_max_recent_messages_sets_window() -> None:
+    """max_recent_messages overrides the default window when a summary is present."""
+    state = {"messages": _messages(25), "summary": "Earlier context.", "max_recent_messages": 3}
+
+    history = build_conversation_and_user_context(state)["conversation_history"]
+
+    assert history.startswith("Prior summary:\nEarlier context.\n\nConversation:\n")
+    assert _history_lines(history) == [
+        "1. User: message 22",
+        "2. Assistant: message 23",
+        "3. User: message 24",
+    ]